@@ -5,48 +5,48 @@
 import argparse
 import sys
 from pathlib import Path
-from typing import Any, List, cast
+from typing import Any, Dict, List, Tuple, cast
 
+from commands import SUBCOMMANDS
 from util import UserCard, load_json, save_json
 
 
+_RARITY_MAP = {"R": 1, "SR": 2, "SSR": 3, "1": 1, "2": 2, "3": 3}
+
+_TYPE_MAP = {
+    "spd": 0,
+    "sta": 1,
+    "pow": 2,
+    "gut": 3,
+    "wit": 4,
+    "fri": 5,
+    "0": 0,
+    "1": 1,
+    "2": 2,
+    "3": 3,
+    "4": 4,
+    "5": 5,
+}
+
+
 def parse_rarity(value: str) -> int:
     """Parse rarity from string (R/SR/SSR) or int (1/2/3)."""
-    value_upper = value.upper()
-    if value_upper == "R":
-        return 1
-    elif value_upper == "SR":
-        return 2
-    elif value_upper == "SSR":
-        return 3
-    elif value in ["1", "2", "3"]:
-        return int(value)
-    else:
+    try:
+        return _RARITY_MAP[value.upper()]
+    except KeyError:
         raise argparse.ArgumentTypeError(
             f"Invalid rarity '{value}'. Use R, SR, SSR, or 1, 2, 3"
-        )
+        ) from None
 
 
 def parse_type(value: str) -> int:
     """Parse card type from string (spd/sta/pow/gut/wit/fri) or int (0-5)."""
-    value_lower = value.lower()
-    type_map = {
-        "spd": 0,
-        "sta": 1,
-        "pow": 2,
-        "gut": 3,
-        "wit": 4,
-        "fri": 5,
-    }
-
-    if value_lower in type_map:
-        return type_map[value_lower]
-    elif value in ["0", "1", "2", "3", "4", "5"]:
-        return int(value)
-    else:
+    try:
+        return _TYPE_MAP[value.lower()]
+    except KeyError:
         raise argparse.ArgumentTypeError(
             f"Invalid type '{value}'. Use spd, sta, pow, gut, wit, fri, or 0-5"
-        )
+        ) from None
 
 
 def find_card_index(
@@ -63,14 +63,37 @@ def find_card_index(
     return -1
 
 
+def build_card_index(cards: List[UserCard]) -> Dict[Tuple[str, int, int], int]:
+    """Map (name, type, rarity) -> index in the collection, keeping the first match.
+
+    Only worth building when several add_card calls share one loaded collection;
+    a single lookup is cheaper with find_card_index.
+    """
+    idx_map: Dict[Tuple[str, int, int], int] = {}
+    for i, card in enumerate(cards):
+        key = (card.get("name"), card.get("type"), card.get("rarity"))
+        idx_map.setdefault(key, i)  # type: ignore[arg-type]
+    return idx_map
+
+
 def add_card(
-    cards: List[UserCard], name: str, card_type: int, rarity: int
+    cards: List[UserCard],
+    name: str,
+    card_type: int,
+    rarity: int,
+    idx_map: Dict[Tuple[str, int, int], int] | None = None,
 ) -> tuple[List[UserCard], str]:
     """
     Add a card to the collection or increase its lb.
+    If idx_map (from build_card_index) is given, it is used for the lookup and
+    kept up to date when a new card is appended.
     Returns (updated_cards, message).
     """
-    idx = find_card_index(cards, name, card_type, rarity)
+    key = (name, card_type, rarity)
+    if idx_map is not None:
+        idx = idx_map.get(key, -1)
+    else:
+        idx = find_card_index(cards, name, card_type, rarity)
 
     if idx != -1:
         # Card exists
@@ -95,6 +118,8 @@ def add_card(
             "lb": 0,
         }
         cards.append(new_card)
+        if idx_map is not None:
+            idx_map[key] = len(cards) - 1
         return cards, f"Added new card '{name}' with lb=0"
 
 
@@ -102,7 +127,7 @@ def add_subparser(subparsers: Any) -> None:
     """Add the 'add' subcommand to the argument parser."""
     parser = subparsers.add_parser(
         "add",
-        help="Add a new card to your collection or increase its limit break",
+        help=SUBCOMMANDS["add"][1],
         description="Add a new card to my_cards.json or increase the limit break level of an existing card.",
     )
 
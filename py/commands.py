@@ -0,0 +1,16 @@
+# SPDX-License-Identifier: MIT
+
+"""Subcommand registry shared by main.py and the subcommand modules.
+
+Kept free of imports so main.py can list every subcommand without loading
+the modules that implement them.
+"""
+
+# Subcommand name -> (module name, help text).
+SUBCOMMANDS = {
+    "enrich": ("enrich", "Enrich card data with tierlist information"),
+    "visualize": ("visualize", "Generate Markdown visualization of enriched cards"),
+    "recommend": ("recommend", "Recommend best cards for a deck"),
+    "update": ("fetch", "Update local precomputed tierlist data from the internet"),
+    "add": ("add", "Add a new card to your collection or increase its limit break"),
+}
@@ -18,157 +18,293 @@ from __future__ import annotations
 
 import argparse
 import json
+import re
+import shutil
 import sys
-from dataclasses import dataclass
+from collections import Counter
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Mapping, cast
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Tuple, cast
 
+try:
+    import ijson
+except ImportError:  # pragma: no cover - only needed for --low-memory
+    ijson = None  # type: ignore[assignment]
+
+from commands import SUBCOMMANDS
 from util import (
-    EnrichedCard,
-    EnrichedData,
     TierlistCard,
     TierlistData,
     UserCard,
+    atomic_write,
     get_file_hash,
+    get_file_signature,
     load_json,
-    save_json,
+    save_json_stream,
 )
 
 
-@dataclass(frozen=True)
-class CardKey:
-    """Composite key for looking up cards in the tierlist.
+# Composite key for looking up cards in the tierlist: (name, type, rarity).
+# A plain tuple hashes and compares in C, which keeps index build and lookup cheap.
+CardKey = Tuple[str, int, int]
+
+# Pre-validated tierlist entry: (has_id, id, levels). has_id says whether the entry
+# had an "id" key at all (its value, even null, is copied to enriched cards), and
+# levels[lb] is the (score, tier) pair for that limit break, or None if the
+# entry's scores/tiers were malformed.
+IndexedCard = Tuple[bool, int | None, Tuple[Tuple[int, str], ...] | None]
+
+
+def _index_tierlist_card(
+    index: Dict[CardKey, IndexedCard], card: TierlistCard
+) -> None:
+    """Insert a single tierlist card into the (name, type, rarity) index."""
+    name = card.get("name")
+    ctype = card.get("type")
+    rarity = card.get("rarity")
+
+    if (
+        not isinstance(name, str)
+        or not isinstance(ctype, int)
+        or not isinstance(rarity, int)
+    ):
+        # Incomplete or malformed entry; skip.
+        return
+
+    # Interned names let key lookups short-circuit on pointer equality.
+    name = sys.intern(name)
+    key = (name, ctype, rarity)
+
+    if key in index:
+        # Multiple entries for the same (name, type, rarity). This *shouldn't* happen,
+        # but if it does, warn and keep the first one.
+        print(
+            "warning: duplicate tierlist entry for "
+            f"(name={name!r}, type={ctype}, rarity={rarity}); ignoring later one",
+            file=sys.stderr,
+        )
+        return
 
-    Keys are built from (name, type, rarity) as requested.
-    """
+    # Validate and flatten scores/tiers once here rather than on every lookup.
+    scores = card.get("scores")
+    tiers = card.get("tiers")
+    if isinstance(scores, list) and isinstance(tiers, list):
+        levels: Tuple[Tuple[int, str], ...] | None = tuple(zip(scores, tiers))
+    else:
+        levels = None
 
-    name: str
-    type: int
-    rarity: int
+    index[key] = ("id" in card, card.get("id"), levels)
 
 
-def build_tierlist_index(tierlist: TierlistData) -> Dict[CardKey, TierlistCard]:
-    """Build an index from (name, type, rarity) -> card info from the tierlist."""
+def build_tierlist_index(tierlist: TierlistData) -> Dict[CardKey, IndexedCard]:
+    """Build an index from (name, type, rarity) -> IndexedCard from the tierlist."""
 
     cards = tierlist.get("cards")
     if cards is None:
         raise ValueError("tierlist JSON missing 'cards' object")
 
-    index: Dict[CardKey, TierlistCard] = {}
+    index: Dict[CardKey, IndexedCard] = {}
 
     for _card_id, card in cards.items():
-        name = card.get("name")
-        ctype = card.get("type")
-        rarity = card.get("rarity")
+        _index_tierlist_card(index, card)
 
-        if (
-            not isinstance(name, str)
-            or not isinstance(ctype, int)
-            or not isinstance(rarity, int)
-        ):
-            # Incomplete or malformed entry; skip.
-            continue
+    return index
 
-        key = CardKey(name=name, type=ctype, rarity=rarity)
 
-        if key in index:
-            # Multiple entries for the same (name, type, rarity). This *shouldn't* happen,
-            # but if it does, warn and keep the first one.
-            print(
-                "warning: duplicate tierlist entry for "
-                f"(name={name!r}, type={ctype}, rarity={rarity}); ignoring later one",
-                file=sys.stderr,
-            )
-            continue
+def build_tierlist_index_streaming(path: Path) -> Dict[CardKey, IndexedCard]:
+    """Build the tierlist index by stream-parsing `path` with ijson.
+
+    Only one card object is materialized at a time, which keeps peak memory low
+    at the cost of being slower than a whole-file parse.
+    """
+    if ijson is None:
+        raise RuntimeError("--low-memory requires the 'ijson' package")
 
-        index[key] = card
+    index: Dict[CardKey, IndexedCard] = {}
+
+    with path.open("rb") as f:
+        for _card_id, card in ijson.kvitems(f, "cards", use_float=True):
+            if isinstance(card, dict):
+                _index_tierlist_card(index, cast(TierlistCard, card))
 
     return index
 
 
+# Summary line for each warning bucket recorded by enrich_cards.
+WARNING_MESSAGES = {
+    "invalid_key": "card(s) with invalid key fields were not enriched",
+    "no_tierlist_match": "card(s) had no tierlist match and were skipped",
+    "invalid_lb": "card(s) have a non-integer lb; skipped score/tier",
+    "invalid_scores": "card(s) have invalid tierlist scores/tiers; skipped score/tier",
+    "lb_out_of_range": "card(s) have an lb index out of range; skipped score/tier",
+}
+
+# How many example cards to list under each warning summary line.
+MAX_WARNING_EXAMPLES = 5
+
+
+def _record_warning(
+    warnings: Counter[str],
+    examples: Dict[str, List[str]],
+    bucket: str,
+    detail: str,
+) -> None:
+    """Count a warning and keep the first few details as examples."""
+    warnings[bucket] += 1
+    if warnings[bucket] <= MAX_WARNING_EXAMPLES:
+        examples.setdefault(bucket, []).append(detail)
+
+
+def print_warning_summary(
+    warnings: Counter[str], examples: Mapping[str, List[str]]
+) -> None:
+    """Print one stderr line per warning bucket, followed by example cards."""
+    for bucket, message in WARNING_MESSAGES.items():
+        count = warnings.get(bucket, 0)
+        if not count:
+            continue
+        print(f"warning: {count} {message}:", file=sys.stderr)
+        shown = examples.get(bucket, [])
+        for detail in shown:
+            print(f"  {detail}", file=sys.stderr)
+        if count > len(shown):
+            print(f"  ... and {count - len(shown)} more", file=sys.stderr)
+
+
 def enrich_cards(
     cards: Iterable[UserCard],
-    tier_index: Mapping[CardKey, TierlistCard],
-) -> List[Dict[str, object]]:
-    """Return a new list of cards enriched with id/score/tier when available."""
+    tier_index: Mapping[CardKey, IndexedCard],
+    warnings: Counter[str] | None = None,
+    examples: Dict[str, List[str]] | None = None,
+) -> Iterator[Dict[str, object]]:
+    """Yield new cards enriched with id/score/tier when available.
+
+    Problems are tallied into `warnings` (with examples in `examples`) rather than
+    printed per card. If no counter is given, a summary is printed once the
+    generator is exhausted.
+    """
 
-    enriched: List[Dict[str, object]] = []
+    report = warnings is None
+    if warnings is None:
+        warnings = Counter()
+    if examples is None:
+        examples = {}
 
     for card in cards:
-        # Work on a shallow copy so we don't mutate the original input.
-        out: Dict[str, object] = dict(card)
-
+        # Output dicts are built fresh so we never mutate the original input.
         name = card.get("name")
         ctype = card.get("type")
         rarity = card.get("rarity")
         lb = card.get("lb")
 
-        lb_valid = isinstance(lb, int)
-
         if not (
             isinstance(name, str) and isinstance(ctype, int) and isinstance(rarity, int)
         ):
-            print(
-                "warning: skipping enrichment for card with invalid key fields: "
+            _record_warning(
+                warnings,
+                examples,
+                "invalid_key",
                 f"name={name!r}, type={ctype!r}, rarity={rarity!r}",
-                file=sys.stderr,
             )
-            enriched.append(out)
+            yield dict(card)
             continue
 
-        key = CardKey(name=name, type=ctype, rarity=rarity)
-        tier_card = tier_index.get(key)
-
-        if tier_card is None:
-            # No tierlist entry found for this card; log and skip it entirely.
-            print(
-                "warning: no tierlist match for card "
-                f"(name={name!r}, type={ctype}, rarity={rarity}); skipping",
-                file=sys.stderr,
+        name = sys.intern(name)
+        key = (name, ctype, rarity)
+        tier_entry = tier_index.get(key)
+
+        if tier_entry is None:
+            # No tierlist entry found for this card; record and skip it entirely.
+            _record_warning(
+                warnings,
+                examples,
+                "no_tierlist_match",
+                f"(name={name!r}, type={ctype}, rarity={rarity})",
             )
             continue
 
-        # Add ID from tierlist if present.
-        if "id" in tier_card:
-            out["id"] = tier_card["id"]
+        has_id, card_id, levels = tier_entry
+        out: Dict[str, object] = dict(card)
+        if has_id:
+            out["id"] = card_id
 
         # Only try to add score/tier if we have a sensible lb and score/tier arrays.
-        if not lb_valid:
-            print(
-                f"warning: lb is not an integer for card {name!r}; skipping score/tier",
-                file=sys.stderr,
+        if not isinstance(lb, int):
+            _record_warning(warnings, examples, "invalid_lb", f"{name!r} (lb={lb!r})")
+        elif levels is None:
+            _record_warning(warnings, examples, "invalid_scores", repr(name))
+        elif not 0 <= lb < len(levels):
+            _record_warning(
+                warnings,
+                examples,
+                "lb_out_of_range",
+                f"{name!r} (lb={lb}, levels={len(levels)})",
             )
-            enriched.append(out)
-            continue
+        else:
+            out["score"], out["tier"] = levels[lb]
 
-        scores = tier_card.get("scores")
-        tiers = tier_card.get("tiers")
+        yield out
 
-        if not isinstance(scores, list) or not isinstance(tiers, list):
-            print(
-                f"warning: missing or invalid scores/tiers for card {name!r}; "
-                "skipping score/tier",
-                file=sys.stderr,
-            )
-            enriched.append(out)
-            continue
+    if report:
+        print_warning_summary(warnings, examples)
 
-        if not (0 <= lb < len(scores)) or not (0 <= lb < len(tiers)):
-            print(
-                "warning: lb index out of range for card "
-                f"{name!r} (lb={lb}, scores_len={len(scores)}, tiers_len={len(tiers)}); "
-                "skipping score/tier",
-                file=sys.stderr,
-            )
-            enriched.append(out)
-            continue
 
-        out["score"] = scores[lb]
-        out["tier"] = tiers[lb]
+# Matches the (flat, string-valued) metadata object near the start of an
+# enriched output file, and the key/value pairs inside it.
+_METADATA_RE = re.compile(rb'"metadata"\s*:\s*\{([^{}]*)\}')
+_METADATA_ITEM_RE = re.compile(rb'"([^"]*)"\s*:\s*"([^"]*)"')
+
+# The metadata object is written first and is tiny, so this is plenty.
+_METADATA_PREFIX_BYTES = 512
+
+
+def read_metadata(path: Path) -> Dict[str, str] | None:
+    """Read the metadata object from the head of an enriched file.
+
+    Only the first few hundred bytes are read, so the cached cards are never
+    parsed. Returns None if the metadata can't be found there.
+    """
+    try:
+        with path.open("rb") as f:
+            head = f.read(_METADATA_PREFIX_BYTES)
+    except OSError:
+        return None
+
+    match = _METADATA_RE.search(head)
+    if match is None:
+        return None
+    return {
+        key.decode("utf-8"): value.decode("utf-8")
+        for key, value in _METADATA_ITEM_RE.findall(match.group(1))
+    }
+
+
+def update_metadata(path: Path, updates: Mapping[str, str]) -> bool:
+    """Rewrite metadata values at the head of an enriched file in place.
+
+    Only keys already present in the metadata object are updated; the cards are
+    copied byte for byte and never parsed. Returns whether the file was rewritten.
+    """
+    data = path.read_bytes()
+    match = _METADATA_RE.search(data, 0, _METADATA_PREFIX_BYTES)
+    if match is None:
+        return False
+
+    def replace_value(item: re.Match[bytes]) -> bytes:
+        value = updates.get(item.group(1).decode("utf-8"))
+        if value is None:
+            return item.group(0)
+        start = item.start(2) - item.start()
+        end = item.end(2) - item.start()
+        encoded = json.dumps(value)[1:-1].encode("utf-8")  # escaped, unquoted
+        return item.group(0)[:start] + encoded + item.group(0)[end:]
 
-        enriched.append(out)
+    body = _METADATA_ITEM_RE.sub(replace_value, match.group(1))
+    if body == match.group(1):
+        return False
 
-    return enriched
+    with atomic_write(path) as f:
+        f.write(data[: match.start(1)] + body + data[match.end(1) :])
+    return True
 
 
 def add_subparser(subparsers: Any) -> None:
@@ -177,7 +313,7 @@ def add_subparser(subparsers: Any) -> None:
 
     parser = subparsers.add_parser(
         "enrich",
-        help="Enrich card data with tierlist information",
+        help=SUBCOMMANDS["enrich"][1],
         description=(
             "Enrich my_cards.json with id/score/tier from precomputed-tierlist.json "
             "based on (name, type, rarity)."
@@ -227,32 +363,80 @@ def add_subparser(subparsers: Any) -> None:
         help="Pretty-print JSON output with indentation.",
     )
 
+    parser.add_argument(
+        "--low-memory",
+        action="store_true",
+        help="Stream-parse the tierlist to reduce peak memory (requires ijson; slower).",
+    )
+
     parser.set_defaults(func=run)
 
 
 def run(args: argparse.Namespace) -> int:
     """Execute the enrich subcommand."""
-    # Calculate hashes of input files to see if we need to re-enrich.
-    current_input_hash = get_file_hash(args.input)
-    current_tierlist_hash = get_file_hash(args.tierlist)
+    # Cheap size/mtime signatures let an unchanged run skip hashing entirely.
+    input_signature = get_file_signature(args.input)
+    tierlist_signature = get_file_signature(args.tierlist)
+    current_input_hash: str | None = None
+    current_tierlist_hash: str | None = None
 
     if not args.force and args.output.exists():
         try:
-            existing_data = cast(Dict[str, Any], load_json(args.output))
-            if "metadata" in existing_data:
+            metadata = read_metadata(args.output)
+            if metadata is None:
+                # Metadata isn't at the head of the file; fall back to a full parse.
+                existing_data = cast(Dict[str, Any], load_json(args.output))
                 metadata = cast(Dict[str, str], existing_data.get("metadata", {}))
+
+            # A file whose signature is unchanged keeps its stored hash; only
+            # files that were touched are rehashed to see if their content changed.
+            if input_signature and metadata.get("input_signature") == input_signature:
+                current_input_hash = metadata.get("input_hash")
+            else:
+                current_input_hash = get_file_hash(args.input)
+            if (
+                tierlist_signature
+                and metadata.get("tierlist_signature") == tierlist_signature
+            ):
+                current_tierlist_hash = metadata.get("tierlist_hash")
+            else:
+                current_tierlist_hash = get_file_hash(args.tierlist)
+
+            if (
+                metadata.get("input_hash") == current_input_hash
+                and metadata.get("tierlist_hash") == current_tierlist_hash
+            ):
+                # Touched but unchanged files: store their new signatures so later
+                # runs don't rehash them again.
                 if (
-                    metadata.get("input_hash") == current_input_hash
-                    and metadata.get("tierlist_hash") == current_tierlist_hash
-                ):
-                    print(
-                        "Enriched data is already up to date. Use --force to re-enrich."
+                    input_signature
+                    and tierlist_signature
+                    and (
+                        metadata.get("input_signature") != input_signature
+                        or metadata.get("tierlist_signature") != tierlist_signature
                     )
-                    return 0
+                ):
+                    try:
+                        update_metadata(
+                            args.output,
+                            {
+                                "input_signature": input_signature,
+                                "tierlist_signature": tierlist_signature,
+                            },
+                        )
+                    except OSError:
+                        pass  # Best effort; the next run just rehashes.
+                print("Enriched data is already up to date. Use --force to re-enrich.")
+                return 0
         except Exception:
             # If anything goes wrong reading the existing file, just proceed with enrichment.
             pass
 
+    if current_input_hash is None:
+        current_input_hash = get_file_hash(args.input)
+    if current_tierlist_hash is None:
+        current_tierlist_hash = get_file_hash(args.tierlist)
+
     # Load input data.
     cards_data_obj = load_json(args.input)
     if not isinstance(cards_data_obj, list):
@@ -264,38 +448,57 @@ def run(args: argparse.Namespace) -> int:
 
     cards_data = cast(List[UserCard], cards_data_obj)
 
-    tierlist_data_obj = load_json(args.tierlist)
-    tierlist_data = cast(TierlistData, tierlist_data_obj)
-    tier_index = build_tierlist_index(tierlist_data)
-
-    enriched_cards = enrich_cards(cards_data, tier_index)
-
-    # Prepare the output structure with metadata.
-    output_data: EnrichedData = {
-        "metadata": {
-            "input_hash": current_input_hash,
-            "tierlist_hash": current_tierlist_hash,
-        },
-        "cards": cast(List[EnrichedCard], enriched_cards),
+    if args.low_memory:
+        try:
+            tier_index = build_tierlist_index_streaming(args.tierlist)
+        except Exception as e:
+            print(
+                f"error: failed to stream-parse {args.tierlist}: {e}", file=sys.stderr
+            )
+            return 1
+    else:
+        tierlist_data_obj = load_json(args.tierlist, cache=True)
+        tierlist_data = cast(TierlistData, tierlist_data_obj)
+        tier_index = build_tierlist_index(tierlist_data)
+
+    warnings: Counter[str] = Counter()
+    examples: Dict[str, List[str]] = {}
+    enriched_cards = enrich_cards(cards_data, tier_index, warnings, examples)
+
+    output_metadata: Dict[str, str] = {
+        "input_hash": current_input_hash,
+        "tierlist_hash": current_tierlist_hash,
+        "input_signature": input_signature,
+        "tierlist_signature": tierlist_signature,
     }
 
     # Write to file (never overwrite the original input unless the user explicitly
-    # passes the same path for --output, which is on them).
+    # passes the same path for --output, which is on them). Cards are streamed
+    # straight from the generator, so the enriched list is never held in memory.
     try:
-        save_json(args.output, output_data, pretty=args.pretty)
+        save_json_stream(
+            args.output,
+            {"metadata": output_metadata},
+            "cards",
+            enriched_cards,
+            pretty=args.pretty,
+        )
+        print_warning_summary(warnings, examples)
         if not args.stdout:
             print(f"Successfully enriched cards and saved to {args.output}")
     except Exception as e:
         print(f"error: failed to write output file {args.output}: {e}", file=sys.stderr)
         return 1
 
-    # Optionally print to stdout for *nix-style piping.
+    # Optionally print to stdout for *nix-style piping, copying the file we just
+    # wrote rather than serializing everything a second time.
     if args.stdout:
-        if args.pretty:
-            json.dump(output_data, sys.stdout, ensure_ascii=False, indent=2)
-        else:
-            json.dump(output_data, sys.stdout, ensure_ascii=False)
-        # Ensure trailing newline for nicer terminals.
-        sys.stdout.write("\n")
+        # Write raw bytes, flushing the text layer first to keep output ordered.
+        sys.stdout.flush()
+        with args.output.open("rb") as f:
+            shutil.copyfileobj(f, sys.stdout.buffer)
+        # Ensure trailing newline for nicer terminals (pretty output has one).
+        if not args.pretty:
+            sys.stdout.buffer.write(b"\n")
 
     return 0
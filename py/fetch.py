@@ -5,12 +5,12 @@
 from __future__ import annotations
 
 import argparse
-import json
 import sys
 from pathlib import Path
 from typing import Any
 
-from util import save_json
+from commands import SUBCOMMANDS
+from util import dumps_json, loads_json, save_json
 
 URL = "https://uma.moe/assets/data/precomputed-tierlist.json"
 
@@ -20,7 +20,7 @@ def add_subparser(subparsers: Any) -> None:
     default_base = Path(__file__).resolve().parent.parent
     parser = subparsers.add_parser(
         "update",
-        help="Update local precomputed tierlist data from the internet",
+        help=SUBCOMMANDS["update"][1],
         description=(
             "Download the latest precomputed tierlist JSON from "
             f"{URL} and save it locally, then re-enrich your cards."
@@ -43,26 +43,26 @@ def add_subparser(subparsers: Any) -> None:
 
 def run(args: argparse.Namespace) -> int:
     """Execute the fetch command."""
-    # Fetch content from the URL using urllib to avoid external dependencies
+    # Fetch content from the URL using urllib to avoid external dependencies.
+    # The body is kept as bytes and parsed directly, skipping a str decode.
     try:
         import urllib.request
 
         with urllib.request.urlopen(URL) as resp:  # nosec B310
-            text = resp.read().decode("utf-8")
+            raw = resp.read()
     except Exception as e:
         print(f"error: failed to fetch data: {e}", file=sys.stderr)
         return 1
 
     # Parse JSON to ensure it is valid
     try:
-        parsed: Any = json.loads(text)
-    except json.JSONDecodeError as e:
+        parsed: Any = loads_json(raw)
+    except ValueError as e:
         print(f"error: fetched content is not valid JSON: {e}", file=sys.stderr)
         return 1
 
     if args.stdout:
-        json.dump(parsed, sys.stdout, indent=2, ensure_ascii=False)
-        print()
+        sys.stdout.buffer.write(dumps_json(parsed, newline=True))
         return 0
 
     # Save to file
@@ -81,7 +81,9 @@ def run(args: argparse.Namespace) -> int:
                 tierlist=args.output,
                 output=base / "my_cards_enriched.json",
                 stdout=False,
+                force=False,
                 pretty=True,
+                low_memory=False,
             )
             print("Re-enriching cards with the updated tierlist...")
             enrich.run(enrich_args)  # type: ignore[arg-type]
@@ -13,12 +13,10 @@ More subcommands will be added in the future.
 from __future__ import annotations
 
 import argparse
+import importlib
+import sys
 
-import add
-import fetch
-import enrich
-import recommend
-import visualize
+from commands import SUBCOMMANDS
 
 
 def main(argv: list[str] | None = None) -> int:
@@ -36,12 +34,19 @@ def main(argv: list[str] | None = None) -> int:
         required=True,
     )
 
-    # Register subcommands
-    enrich.add_subparser(subparsers)
-    visualize.add_subparser(subparsers)
-    recommend.add_subparser(subparsers)
-    fetch.add_subparser(subparsers)
-    add.add_subparser(subparsers)
+    # Register subcommands. Only the requested one gets its full parser; the
+    # rest are name + help placeholders so top-level --help still lists them.
+    if argv is None:
+        argv = sys.argv[1:]
+    requested = next((arg for arg in argv if not arg.startswith("-")), None)
+
+    # A module is only imported when its subcommand is the one being run,
+    # keeping startup cheap for the others.
+    for name, (module_name, help_text) in SUBCOMMANDS.items():
+        if name == requested:
+            importlib.import_module(module_name).add_subparser(subparsers)
+        else:
+            subparsers.add_parser(name, help=help_text)
 
     # Parse arguments and dispatch
     args = parser.parse_args(argv)
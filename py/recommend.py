@@ -11,13 +11,22 @@ This module builds a deck recommendation by:
 from __future__ import annotations
 
 import argparse
+import functools
+import heapq
 import sys
+from operator import attrgetter, itemgetter
 from pathlib import Path
-from typing import Any, Dict, List, cast
+from typing import Any, Dict, Iterable, List, NamedTuple, Set, cast
 
-from util import EnrichedCard, TYPE_NAMES, load_enriched_cards, load_json
+from commands import SUBCOMMANDS
+from util import LB_NAMES, RARITY_NAMES, TYPE_NAMES, Card, load_cards, load_json
 
-TIER_ORDER = ["S+", "S", "A+", "A", "B+", "B", "C+", "C", "D+", "D", "E+", "E", "F"]
+# Tier names are interned so lookups with interned tiers from the loaders hit on
+# identity.
+TIER_ORDER = tuple(
+    sys.intern(t)
+    for t in ("S+", "S", "A+", "A", "B+", "B", "C+", "C", "D+", "D", "E+", "E", "F")
+)
 TIER_VALUE = {t: len(TIER_ORDER) - i for i, t in enumerate(TIER_ORDER)}
 
 
@@ -28,14 +37,26 @@ def get_tier_value(tier: str | None) -> int:
     return TIER_VALUE.get(tier, 0)
 
 
-def get_best_cards_by_type_from_tierlist(
-    tierlist_path: Path, my_cards: List[EnrichedCard]
-) -> Dict[int, tuple[int, str, int, int, str]]:
-    """Find the best card for each type in the tierlist that the user doesn't have at MLB.
+# Flattened tierlist entry: (card_id, card_name, card_type, max_score, max_tier).
+TierlistEntry = tuple[int, str, int, int, str]
 
-    Returns: Mapping of type -> (card_id, card_name, card_type, max_score, max_tier)
+
+# Tierlist entries of one type. `ranked` is ordered best-first by (tier, score)
+# with ties kept in file order; `file_order` holds each entry's (position, card_id)
+# in the order the file lists them.
+class _TypeGroup(NamedTuple):
+    ranked: tuple[TierlistEntry, ...]
+    file_order: tuple[tuple[int, int], ...]
+
+
+@functools.lru_cache(maxsize=4)
+def _load_tierlist_index(tierlist_path: Path) -> Dict[int, _TypeGroup]:
+    """Load and validate the tierlist once, grouping flattened entries by type.
+
+    Ranking each group up front lets lookups stop at the first usable entry
+    instead of scanning the whole tierlist.
     """
-    data = load_json(tierlist_path)
+    data = load_json(tierlist_path, cache=True)
 
     if not isinstance(data, dict) or "cards" not in data:
         raise ValueError("Invalid tierlist format")
@@ -45,14 +66,9 @@ def get_best_cards_by_type_from_tierlist(
         raise ValueError("Invalid tierlist cards format")
     cards = cast(Dict[str, Any], cards_data)
 
-    # Create a set of IDs that the user already has at MLB (lb=4)
-    mlb_ids = {
-        c.get("id") for c in my_cards if c.get("lb") == 4 and c.get("id") is not None
-    }
+    keyed_by_type: Dict[int, List[tuple[tuple[int, int], int, TierlistEntry]]] = {}
 
-    best_by_type: Dict[int, tuple[int, str, int, int, str]] = {}
-
-    for card_id, card_info in cards.items():
+    for position, (card_id, card_info) in enumerate(cards.items()):
         if not isinstance(card_info, dict):
             continue
 
@@ -63,10 +79,6 @@ def get_best_cards_by_type_from_tierlist(
         if not isinstance(card_id_int, int):
             card_id_int = int(card_id) if card_id.isdigit() else 0
 
-        # Skip if user already has this card at MLB
-        if card_id_int in mlb_ids:
-            continue
-
         scores_obj = card_dict.get("scores", [])
         tiers_obj = card_dict.get("tiers", [])
         if not isinstance(scores_obj, list) or not isinstance(tiers_obj, list):
@@ -78,36 +90,67 @@ def get_best_cards_by_type_from_tierlist(
 
         max_score = max(scores)
         max_tier = tiers[-1]  # Assuming last tier is for MLB
+        if isinstance(max_tier, str):
+            max_tier = sys.intern(max_tier)
         card_type = card_dict.get("type", -1)
         if not isinstance(card_type, int) or card_type == -1:
             continue
 
-        # Compare by tier first, then score
-        current_best = best_by_type.get(card_type)
-        if (
-            not current_best
-            or get_tier_value(max_tier) > get_tier_value(current_best[4])
-            or (
-                get_tier_value(max_tier) == get_tier_value(current_best[4])
-                and max_score > current_best[3]
-            )
-        ):
-            card_name = card_dict.get("name", "Unknown")
-            if not isinstance(card_name, str):
-                card_name = "Unknown"
-            best_by_type[card_type] = (
-                card_id_int,
-                card_name,
-                card_type,
-                max_score,
-                max_tier,
+        card_name = card_dict.get("name", "Unknown")
+        if not isinstance(card_name, str):
+            card_name = "Unknown"
+
+        if card_type not in keyed_by_type:
+            keyed_by_type[card_type] = []
+        keyed_by_type[card_type].append(
+            (
+                (TIER_VALUE.get(max_tier, 0), max_score),
+                position,
+                (card_id_int, card_name, card_type, max_score, max_tier),
             )
+        )
+
+    index: Dict[int, _TypeGroup] = {}
+    for card_type, keyed in keyed_by_type.items():
+        file_order = tuple((position, entry[0]) for _, position, entry in keyed)
+        # sort() is stable, so equal keys stay in file order.
+        keyed.sort(key=itemgetter(0), reverse=True)
+        ranked = tuple(entry for _, _, entry in keyed)
+        index[card_type] = _TypeGroup(ranked, file_order)
+
+    return index
+
 
-    return best_by_type
+def get_best_cards_by_type_from_tierlist(
+    tierlist_path: Path, my_cards: List[Card]
+) -> Dict[int, tuple[int, str, int, int, str]]:
+    """Find the best card for each type in the tierlist that the user doesn't have at MLB.
+
+    Returns: Mapping of type -> (card_id, card_name, card_type, max_score, max_tier)
+    """
+    index = _load_tierlist_index(tierlist_path)
+
+    # Create a set of IDs that the user already has at MLB (lb=4)
+    mlb_ids = {c.id for c in my_cards if c.lb == 4 and c.id is not None}
+
+    # (position of the type's first usable entry, best usable entry) per type
+    found: List[tuple[int, TierlistEntry]] = []
+
+    for group in index.values():
+        # Best by tier first, then score: the first entry not already at MLB
+        best = next((e for e in group.ranked if e[0] not in mlb_ids), None)
+        if best is None:
+            continue
+        first_position = next(p for p, cid in group.file_order if cid not in mlb_ids)
+        found.append((first_position, best))
+
+    # Order types as a single pass over the tierlist file would have seen them.
+    found.sort(key=itemgetter(0))
+    return {entry[2]: entry for _, entry in found}
 
 
 def find_best_card_in_tierlist(
-    tierlist_path: Path, my_cards: List[EnrichedCard]
+    tierlist_path: Path, my_cards: List[Card]
 ) -> tuple[int, str, int, int, str]:
     """Find the absolute best card in the entire tierlist that the user doesn't have at MLB."""
     best_by_type = get_best_cards_by_type_from_tierlist(tierlist_path, my_cards)
@@ -119,10 +162,10 @@ def find_best_card_in_tierlist(
 
 
 def select_best_cards_by_type(
-    my_cards: List[EnrichedCard],
+    my_cards: List[Card],
     type_counts: Dict[int, int],
     exclude_card_id: int | None = None,
-) -> List[EnrichedCard]:
+) -> List[Card]:
     """Select the best cards from my collection for each type.
 
     Args:
@@ -133,33 +176,78 @@ def select_best_cards_by_type(
     Returns:
             List of selected cards
     """
-    # Group cards by type and sort by score descending
-    cards_by_type: Dict[int, List[EnrichedCard]] = {}
+    # Group cards by type, keeping only the types we actually need
+    wanted_types = {t for t, count in type_counts.items() if count > 0}
+    cards_by_type: Dict[int, List[Card]] = {}
     for card in my_cards:
-        card_type = card.get("type")
-        card_id = card.get("id")
+        card_type = card.type
+        card_id = card.id
 
-        # Skip cards without required fields or excluded cards
-        if card_type is None or card_id == exclude_card_id:
+        # Skip cards without required fields, excluded cards, or unneeded types
+        if card_type not in wanted_types or card_id == exclude_card_id:
             continue
 
         if card_type not in cards_by_type:
             cards_by_type[card_type] = []
         cards_by_type[card_type].append(card)
 
-    # Sort each type by score descending
-    for card_list in cards_by_type.values():
-        card_list.sort(key=lambda c: c.get("score", 0), reverse=True)
-
-    # Select the requested number of cards for each type
-    selected: List[EnrichedCard] = []
+    # Select the top-scoring cards for each type. nlargest only keeps `count`
+    # candidates around instead of fully sorting every group, and matches a
+    # stable descending sort + slice.
+    selected: List[Card] = []
     for card_type, count in type_counts.items():
         available = cards_by_type.get(card_type, [])
-        selected.extend(available[:count])
+        selected.extend(
+            heapq.nlargest(count, available, key=attrgetter("score"))
+        )
 
     return selected
 
 
+def _presort_by_type(my_cards: List[Card]) -> Dict[int, List[Card]]:
+    """Group cards by type, with each group sorted by score descending."""
+    cards_by_type: Dict[int, List[Card]] = {}
+    for card in my_cards:
+        card_type = card.type
+        if card_type is None:
+            continue
+
+        if card_type not in cards_by_type:
+            cards_by_type[card_type] = []
+        cards_by_type[card_type].append(card)
+
+    for card_list in cards_by_type.values():
+        card_list.sort(key=attrgetter("score"), reverse=True)
+
+    return cards_by_type
+
+
+def _take_best(
+    ranked: Iterable[Card],
+    count: int,
+    skip_ids: Set[int | None],
+    taken_ids: Set[int | None] | None = None,
+) -> List[Card]:
+    """Take the first `count` cards from an already-ranked sequence, skipping ids.
+
+    If `taken_ids` is given, the id of every card taken is added to it.
+    """
+    taken: List[Card] = []
+    if count <= 0:
+        return taken
+
+    for card in ranked:
+        if card.id in skip_ids:
+            continue
+        taken.append(card)
+        if taken_ids is not None:
+            taken_ids.add(card.id)
+        if len(taken) == count:
+            break
+
+    return taken
+
+
 def format_card_display(
     card_name: str,
     card_type: int,
@@ -179,13 +267,11 @@ def format_card_display(
         parts.append(f"Tier: {tier}")
 
     if lb is not None:
-        lb_display = "MLB" if lb == 4 else str(lb)
+        lb_display = LB_NAMES.get(lb) or str(lb)
         parts.append(f"LB: {lb_display}")
 
     if rarity is not None:
-        rarity_display = (
-            "SSR" if rarity == 3 else ("SR" if rarity == 2 else str(rarity))
-        )
+        rarity_display = RARITY_NAMES.get(rarity) or str(rarity)
         parts.append(f"Rarity: {rarity_display}")
 
     if is_borrowed:
@@ -194,13 +280,67 @@ def format_card_display(
     return " | ".join(parts)
 
 
+def print_deck(
+    title: str,
+    support_card: tuple[int, str, int, int] | None,
+    selected: List[Card],
+    empty_message: str,
+) -> None:
+    """Print a recommended deck: the borrowed support card, then the user's cards.
+
+    The lines are collected and written to stdout in a single call.
+    """
+    out: List[str] = ["=" * 70, title, "=" * 70, ""]
+
+    if support_card:
+        _, best_name, best_type, best_score = support_card
+        out.append(
+            format_card_display(
+                best_name,
+                best_type,
+                best_score,
+                is_borrowed=True,
+            )
+        )
+        out.append("")
+
+    if not selected:
+        out.append(empty_message)
+        sys.stdout.write("\n".join(out) + "\n")
+        return
+
+    for card in selected:
+        out.append(
+            format_card_display(
+                card.name,
+                card.type if card.type is not None else -1,
+                card.score,
+                card.tier,
+                card.lb,
+                card.rarity,
+            )
+        )
+
+    if support_card:
+        total_score = support_card[3] + sum(map(attrgetter("score"), selected))
+    else:
+        total_score = sum(map(attrgetter("score"), selected))
+
+    out.append("")
+    out.append("=" * 70)
+    out.append(f"Total cards: {len(selected) + (1 if support_card else 0)}")
+    out.append(f"Combined score: {total_score}")
+    out.append("=" * 70)
+    sys.stdout.write("\n".join(out) + "\n")
+
+
 def add_subparser(subparsers: Any) -> None:
     """Add the 'recommend' subcommand to the argument parser."""
     default_base = Path(__file__).resolve().parent.parent
 
     parser = subparsers.add_parser(
         "recommend",
-        help="Recommend best cards for a deck",
+        help=SUBCOMMANDS["recommend"][1],
         description="Build a 6-card deck recommendation with the best available cards. "
         "Use positional arguments (speed stamina power guts wit [friend]) or --best for top cards.",
     )
@@ -329,12 +469,12 @@ def run(args: argparse.Namespace) -> int:
         return 1
 
     # Load user's cards
-    my_cards = load_enriched_cards(args.input)
+    my_cards = load_cards(args.input)
 
     # Find the best support card from tierlist if requested
     support_card = None
     exclude_id = None
-    selected: List[EnrichedCard] = []
+    selected: List[Card] = []
 
     if not args.no_support and total_cards < 6:
         try:
@@ -343,10 +483,19 @@ def run(args: argparse.Namespace) -> int:
                 args.tierlist, my_cards
             )
 
+            # Rank the collection once; each candidate below just walks these
+            # pre-sorted lists, skipping the cards it can't use.
+            sorted_by_type = _presort_by_type(my_cards)
+            ranked_cards = sorted(
+                (c for c in my_cards if c.has_score),
+                key=attrgetter("score"),
+                reverse=True,
+            )
+
             best_overall_tier_val = -1
             best_overall_score = -1
             best_support = None
-            best_selected_for_support: List[EnrichedCard] = []
+            best_selected_for_support: List[Card] = []
 
             for borrow_candidate in potential_borrows.values():
                 cand_id, _, cand_type, cand_score, cand_tier = borrow_candidate
@@ -356,30 +505,34 @@ def run(args: argparse.Namespace) -> int:
                 if sim_type_counts.get(cand_type, 0) > 0:
                     sim_type_counts[cand_type] -= 1
 
-                # Simulate deck with this borrow_candidate
-                current_selected = select_best_cards_by_type(
-                    my_cards, sim_type_counts, cand_id
-                )
+                # Simulate deck with this borrow_candidate, collecting the ids
+                # taken so the fill pass below can skip them
+                current_selected: List[Card] = []
+                borrow_ids: Set[int | None] = {cand_id}
+                sel_ids: Set[int | None] = {cand_id}
+                for card_type, count in sim_type_counts.items():
+                    current_selected.extend(
+                        _take_best(
+                            sorted_by_type.get(card_type, []),
+                            count,
+                            borrow_ids,
+                            sel_ids,
+                        )
+                    )
 
                 # Fill remaining slots to reach 6 total (including borrow)
                 current_total = len(current_selected) + 1
                 if current_total < 6:
-                    sel_ids = {c.get("id") for c in current_selected}
-                    sel_ids.add(cand_id)
-                    rem = [
-                        c
-                        for c in my_cards
-                        if c.get("id") not in sel_ids and c.get("score") is not None
-                    ]
-                    rem.sort(key=lambda c: c.get("score", 0), reverse=True)
-                    current_selected.extend(rem[: 6 - current_total])
+                    current_selected.extend(
+                        _take_best(ranked_cards, 6 - current_total, sel_ids)
+                    )
 
                 # Calculate total score and average tier
                 total_score = cand_score + sum(
-                    c.get("score", 0) for c in current_selected
+                    map(attrgetter("score"), current_selected)
                 )
                 total_tier_val = get_tier_value(cand_tier) + sum(
-                    get_tier_value(cast(str, c.get("tier"))) for c in current_selected
+                    TIER_VALUE.get(c.tier or "", 0) for c in current_selected
                 )
 
                 # Compare by total tier value first, then total score
@@ -415,22 +568,24 @@ def run(args: argparse.Namespace) -> int:
         current_total = len(selected)
         if current_total < 6:
             # Get all cards not already selected
-            selected_ids = {card.get("id") for card in selected}
+            selected_ids = {card.id for card in selected}
 
-            remaining_cards = [
+            remaining_cards = (
                 card
                 for card in my_cards
-                if card.get("id") not in selected_ids and card.get("score") is not None
-            ]
-            remaining_cards.sort(key=lambda c: c.get("score", 0), reverse=True)
+                if card.id not in selected_ids and card.has_score
+            )
 
             # Add best remaining cards to reach 6 total
             num_to_add = 6 - current_total
-            selected.extend(remaining_cards[:num_to_add])
+            best_remaining = heapq.nlargest(
+                num_to_add, remaining_cards, key=attrgetter("score")
+            )
+            selected.extend(best_remaining)
 
-            if num_to_add > 0 and remaining_cards:
+            if best_remaining:
                 print(
-                    f"Filled {min(num_to_add, len(remaining_cards))} remaining slot(s) with best available cards\n"
+                    f"Filled {len(best_remaining)} remaining slot(s) with best available cards\n"
                 )
 
     # Check if we got enough cards
@@ -441,59 +596,19 @@ def run(args: argparse.Namespace) -> int:
             file=sys.stderr,
         )
 
-    # Display recommendations
-    print("=" * 70)
-    print("RECOMMENDED DECK")
-    print("=" * 70)
-    print()
-
-    if support_card:
-        _, best_name, best_type, best_score = support_card
-        print(
-            format_card_display(
-                best_name,
-                best_type,
-                best_score,
-                is_borrowed=True,
-            )
-        )
-        print()
-
-    if not selected:
-        print("No cards from your collection match the criteria.")
-        return 0
-
-    for i, card in enumerate(selected, start=1):
-        print(
-            format_card_display(
-                card.get("name", "Unknown"),
-                card.get("type", -1),
-                card.get("score", 0),
-                card.get("tier"),
-                card.get("lb"),
-                card.get("rarity"),
-            )
-        )
-
-    print()
-    print("=" * 70)
-    print(f"Total cards: {len(selected) + (1 if support_card else 0)}")
-
-    if support_card:
-        total_score = support_card[3] + sum(c.get("score", 0) for c in selected)
-    else:
-        total_score = sum(c.get("score", 0) for c in selected)
-
-    print(f"Combined score: {total_score}")
-    print("=" * 70)
-
+    print_deck(
+        "RECOMMENDED DECK",
+        support_card,
+        selected,
+        "No cards from your collection match the criteria.",
+    )
     return 0
 
 
 def run_best_cards(args: argparse.Namespace) -> int:
     """Show the best 6 cards available regardless of type."""
     # Load user's cards
-    my_cards = load_enriched_cards(args.input)
+    my_cards = load_cards(args.input)
 
     # Find the best support card from tierlist if requested
     support_card = None
@@ -512,62 +627,23 @@ def run_best_cards(args: argparse.Namespace) -> int:
         except Exception as e:
             print(f"warning: could not find support card: {e}", file=sys.stderr)
 
-    # Filter out the support card if present and sort by score
-    available_cards = [
+    # Filter out the support card if present
+    available_cards = (
         card
         for card in my_cards
-        if card.get("id") != exclude_id and card.get("score") is not None
-    ]
-    available_cards.sort(key=lambda c: c.get("score", 0), reverse=True)
+        if card.id != exclude_id and card.has_score
+    )
 
-    # Take top 5 (or 6 if no support)
+    # Take top 5 (or 6 if no support) by score
     num_to_take = 5 if support_card else 6
-    selected = available_cards[:num_to_take]
-
-    # Display recommendations
-    print("=" * 70)
-    print("RECOMMENDED DECK (BEST CARDS)")
-    print("=" * 70)
-    print()
-
-    if support_card:
-        _, best_name, best_type, best_score = support_card
-        print(
-            format_card_display(
-                best_name,
-                best_type,
-                best_score,
-                is_borrowed=True,
-            )
-        )
-        print()
-
-    if not selected:
-        print("No cards available in your collection.")
-        return 0
-
-    for card in selected:
-        print(
-            format_card_display(
-                card.get("name", "Unknown"),
-                card.get("type", -1),
-                card.get("score", 0),
-                card.get("tier"),
-                card.get("lb"),
-                card.get("rarity"),
-            )
-        )
-
-    print()
-    print("=" * 70)
-    print(f"Total cards: {len(selected) + (1 if support_card else 0)}")
-
-    if support_card:
-        total_score = support_card[3] + sum(c.get("score", 0) for c in selected)
-    else:
-        total_score = sum(c.get("score", 0) for c in selected)
-
-    print(f"Combined score: {total_score}")
-    print("=" * 70)
+    selected = heapq.nlargest(
+        num_to_take, available_cards, key=attrgetter("score")
+    )
 
+    print_deck(
+        "RECOMMENDED DECK (BEST CARDS)",
+        support_card,
+        selected,
+        "No cards available in your collection.",
+    )
     return 0
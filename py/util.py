@@ -6,9 +6,35 @@ from __future__ import annotations
 
 import hashlib
 import json
+import os
+import pickle
+import stat
 import sys
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, TypedDict, cast
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    TypedDict,
+    cast,
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
+
+# Separators used by dumps_json(pretty=False), so hand-assembled compact output
+# matches what a one-shot dump would produce with either backend.
+_COMPACT_ITEM_SEP = b"," if orjson is not None else b", "
+_COMPACT_KEY_SEP = b":" if orjson is not None else b": "
 
 
 class TierlistCard(TypedDict, total=False):
@@ -56,6 +82,44 @@ class EnrichedData(TypedDict):
     cards: List[EnrichedCard]
 
 
+@dataclass(slots=True)
+class Card:
+    """An enriched card with its fields as attributes, for hot loops.
+
+    Missing fields take the same defaults the dict-based code used with `.get`.
+    `has_score` records whether the card actually had a score, since `score`
+    falls back to 0 for sorting and totals.
+    """
+
+    name: str = "Unknown"
+    type: int | None = None
+    rarity: int | None = None
+    lb: int | None = None
+    id: int | None = None
+    score: int = 0
+    tier: str | None = None
+    has_score: bool = False
+
+    @classmethod
+    def from_dict(cls, card: EnrichedCard) -> Card:
+        """Build a Card from an enriched card dict."""
+        score = card.get("score")
+        tier = card.get("tier")
+        if isinstance(tier, str):
+            # Share one string object per tier so tier lookups compare by identity.
+            tier = sys.intern(tier)
+        return cls(
+            name=card.get("name", "Unknown"),
+            type=card.get("type"),
+            rarity=card.get("rarity"),
+            lb=card.get("lb"),
+            id=card.get("id"),
+            score=score if score is not None else 0,
+            tier=tier,
+            has_score=score is not None,
+        )
+
+
 TYPE_NAMES = {
     0: "Speed",
     1: "Stamina",
@@ -65,33 +129,139 @@ TYPE_NAMES = {
     5: "Friend",
 }
 
+# Display names for the rarity and limit-break values that aren't shown as-is.
+RARITY_NAMES = {2: "SR", 3: "SSR"}
+LB_NAMES = {4: "MLB"}
+
 
 def get_file_hash(path: Path) -> str:
     """Calculate the SHA-256 hash of a file."""
     if not path.exists():
         return ""
-    sha256 = hashlib.sha256()
     try:
-        with path.open("rb") as f:
-            while chunk := f.read(8192):
-                sha256.update(chunk)
+        # Unbuffered: file_digest reads into its own reusable buffer, so the
+        # BufferedReader layer would only add a copy.
+        with path.open("rb", buffering=0) as f:
+            # file_digest runs the read/update loop in C and releases the GIL.
+            return hashlib.file_digest(f, "sha256").hexdigest()
+    except OSError:
+        return ""
+
+
+def get_file_signature(path: Path) -> str:
+    """Return a cheap 'size:mtime_ns' change signature for a file, or "" if missing."""
+    try:
+        st = path.stat()
     except OSError:
         return ""
-    return sha256.hexdigest()
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def loads_json(data: bytes) -> Any:
+    """Parse JSON from bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(data: Any, pretty: bool = True, newline: bool = False) -> bytes:
+    """Serialize data to UTF-8 JSON bytes, using orjson when it is installed.
+
+    With newline=True a trailing newline is added during serialization, which
+    avoids copying the whole buffer just to append one byte.
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if pretty else 0
+        if newline:
+            option |= orjson.OPT_APPEND_NEWLINE
+        return orjson.dumps(data, option=option)
+    if pretty:
+        text = json.dumps(data, indent=2, ensure_ascii=False)
+    else:
+        text = json.dumps(data, ensure_ascii=False)
+    if newline:
+        text += "\n"
+    return text.encode("utf-8")
 
 
-def load_json(path: Path) -> Any:
-    """Load JSON from a file, raising a clear error if it fails."""
+def _parse_cache_path(path: Path) -> Path | None:
+    """Return the per-user cache file for the parse of `path`, or None if unknown.
+
+    Caches live under ~/.cache/uma-cards (or $XDG_CACHE_HOME/uma-cards), never
+    next to the input, and are named after a digest of the input's full path.
+    """
+    try:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        resolved = str(path.resolve())
+    except (OSError, RuntimeError):
+        return None
+    digest = hashlib.sha256(resolved.encode("utf-8")).hexdigest()[:16]
+    return Path(base) / "uma-cards" / f"{path.stem}-{digest}.pkl"
+
+
+def _read_parse_cache(cache_path: Path, signature: str) -> Any:
+    """Return the cached parse in `cache_path` if it matches `signature`, else None.
+
+    Unpickling can run arbitrary code, so the cache is only trusted if it is owned
+    by the current user and not writable by group or others.
+    """
     try:
-        with path.open("r", encoding="utf-8") as f:
-            return json.load(f)
+        with cache_path.open("rb") as f:
+            st = os.fstat(f.fileno())
+            getuid = getattr(os, "getuid", None)
+            if (getuid is not None and st.st_uid != getuid()) or st.st_mode & 0o022:
+                return None
+            cached_signature, data = pickle.load(f)
+    except Exception:
+        # Missing, stale-format, or corrupt cache; just re-parse the JSON.
+        return None
+    return data if cached_signature == signature else None
+
+
+def _write_parse_cache(cache_path: Path, signature: str, data: Any) -> None:
+    """Best-effort atomic write of a parsed JSON document to its cache file."""
+    try:
+        cache_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        with atomic_write(cache_path, perms=0o600) as f:
+            pickle.dump((signature, data), f, protocol=5)
+    except (OSError, pickle.PicklingError):
+        pass
+
+
+def load_json(path: Path, cache: bool = False) -> Any:
+    """Load JSON from a file, raising a clear error if it fails.
+
+    With cache=True the parsed result is also pickled into the user's cache
+    directory, keyed on the file's size and mtime, and reused on later loads until
+    the JSON file changes. Use it for large, rarely-changing files like the
+    tierlist. The cache is skipped when orjson is installed, since orjson parses
+    the file faster than the pickle loads.
+    """
+    signature = ""
+    cache_path = None
+    if cache and orjson is None:
+        cache_path = _parse_cache_path(path)
+        if cache_path is not None:
+            signature = get_file_signature(path)
+        if cache_path is not None and signature:
+            cached = _read_parse_cache(cache_path, signature)
+            if cached is not None:
+                return cached
+
+    try:
+        data = loads_json(path.read_bytes())
     except FileNotFoundError:
         print(f"error: file not found: {path}", file=sys.stderr)
         sys.exit(1)
-    except json.JSONDecodeError as e:
+    except ValueError as e:
+        # json.JSONDecodeError and orjson.JSONDecodeError both subclass ValueError.
         print(f"error: failed to parse JSON from {path}: {e}", file=sys.stderr)
         sys.exit(1)
 
+    if cache_path is not None and signature:
+        _write_parse_cache(cache_path, signature, data)
+    return data
+
 
 def load_enriched_cards(path: Path) -> List[EnrichedCard]:
     """Load and validate the enriched cards JSON, supporting both old and new formats."""
@@ -109,16 +279,119 @@ def load_enriched_cards(path: Path) -> List[EnrichedCard]:
         sys.exit(1)
 
 
+def load_cards(path: Path) -> List[Card]:
+    """Load the enriched cards JSON as a list of Card objects."""
+    return [Card.from_dict(card) for card in load_enriched_cards(path)]
+
+
 def save_json(path: Path, data: Any, pretty: bool = True) -> None:
     """Save data to a JSON file."""
     try:
         path.parent.mkdir(parents=True, exist_ok=True)
-        with path.open("w", encoding="utf-8") as f:
+        path.write_bytes(dumps_json(data, pretty=pretty, newline=pretty))
+    except OSError as e:
+        print(f"error: failed to write to {path}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def _indent_json(data: bytes, width: int) -> bytes:
+    """Indent every line of pretty-printed JSON by `width` spaces."""
+    pad = b" " * width
+    # Newlines inside JSON strings are always escaped, so this only hits layout.
+    return pad + data.replace(b"\n", b"\n" + pad)
+
+
+@contextmanager
+def atomic_write(
+    path: Path,
+    mode: str = "wb",
+    buffering: int = -1,
+    encoding: str | None = None,
+    perms: int | None = None,
+) -> Iterator[IO[Any]]:
+    """Write to a temporary file next to `path`, moved onto `path` on success.
+
+    Readers never see a partly written `path`: if the block raises (or is
+    interrupted), the temporary file is deleted and `path` is left untouched.
+    A symlinked `path` has its target replaced, not the link. The result gets
+    permission bits `perms`, else those of the file it replaces, else the usual
+    umask-derived mode.
+    """
+    # Write next to the real file so a symlink keeps pointing at the new content.
+    path = path.resolve()
+    if perms is None:
+        try:
+            perms = stat.S_IMODE(path.stat().st_mode)
+        except FileNotFoundError:
+            pass
+
+    tmp = tempfile.NamedTemporaryFile(
+        mode=mode,
+        buffering=buffering,
+        encoding=encoding,
+        dir=path.parent,
+        prefix=f".{path.name}.",
+        suffix=".tmp",
+        delete=False,
+    )
+    try:
+        with tmp:
+            yield tmp
+        if perms is None:
+            # NamedTemporaryFile is created 0600; give the result the usual mode.
+            umask = os.umask(0)
+            os.umask(umask)
+            perms = 0o666 & ~umask
+        os.chmod(tmp.name, perms)
+        os.replace(tmp.name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp.name)
+        except OSError:
+            pass
+        raise
+
+
+def save_json_stream(
+    path: Path,
+    head: Mapping[str, Any],
+    key: str,
+    items: Iterable[Any],
+    pretty: bool = True,
+) -> None:
+    """Save `{**head, key: [*items]}` to a JSON file, serializing one item at a time.
+
+    The output is the same as save_json would write for the full object, but the
+    list is never built in memory, so `items` can be a generator. The file is
+    only replaced once it is complete, so a failure part-way through never leaves
+    a truncated file with valid-looking metadata behind.
+    """
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # A large buffer batches the many small per-item writes into few syscalls.
+        with atomic_write(path, buffering=1 << 20) as f:
             if pretty:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                f.write("\n")
+                f.write(b"{\n")
+                for k, v in head.items():
+                    value = _indent_json(dumps_json(v, pretty=True), 2)[2:]
+                    f.write(b"  " + dumps_json(k) + b": " + value + b",\n")
+                f.write(b"  " + dumps_json(key) + b": [")
+                sep = b"\n"
+                for item in items:
+                    f.write(sep + _indent_json(dumps_json(item, pretty=True), 4))
+                    sep = b",\n"
+                f.write(b"]\n}\n" if sep == b"\n" else b"\n  ]\n}\n")
             else:
-                json.dump(data, f, ensure_ascii=False)
+                f.write(b"{")
+                for k, v in head.items():
+                    f.write(dumps_json(k) + _COMPACT_KEY_SEP)
+                    f.write(dumps_json(v, pretty=False) + _COMPACT_ITEM_SEP)
+                f.write(dumps_json(key) + _COMPACT_KEY_SEP + b"[")
+                sep = b""
+                for item in items:
+                    f.write(sep + dumps_json(item, pretty=False))
+                    sep = _COMPACT_ITEM_SEP
+                f.write(b"]}")
     except OSError as e:
         print(f"error: failed to write to {path}: {e}", file=sys.stderr)
         sys.exit(1)
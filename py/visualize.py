@@ -5,87 +5,167 @@
 from __future__ import annotations
 
 import argparse
+import io
+import os
 import sys
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, List
+from typing import Any, Iterable, List, TextIO, cast
+
+from commands import SUBCOMMANDS
+from util import (
+    LB_NAMES,
+    RARITY_NAMES,
+    TYPE_NAMES,
+    EnrichedCard,
+    atomic_write,
+    load_enriched_cards,
+)
+
+
+def sort_cards_by_score(cards: Iterable[EnrichedCard]) -> List[EnrichedCard]:
+    """Collect `cards` into a list sorted by score, highest first.
+
+    `cards` is consumed in a single pass, so it may be a generator. Cards
+    without a score get a score of 0.
+    """
+    # Missing scores are defaulted to 0 up front so the sort can use a C-level
+    # itemgetter key.
+    all_cards: List[EnrichedCard] = []
+    for card in cards:
+        card.setdefault("score", 0)
+        all_cards.append(card)
 
-from util import EnrichedCard, TYPE_NAMES, load_enriched_cards
+    all_cards.sort(key=itemgetter("score"), reverse=True)
+    return all_cards
 
 
-def generate_markdown(cards: List[EnrichedCard]) -> str:
-    """Generate Markdown visualization of cards grouped by type and sorted by score."""
-    # Group cards by type
+def _format_row(card: EnrichedCard, type_name: str | None = None) -> str:
+    """Format a card as a table row, preceded by a newline.
+
+    If `type_name` is given, a Type column is included after Name.
+    """
+    get = card.get
+    tier = get("tier", "?")
+    score = get("score", 0)
+    name = get("name", "Unknown")
+    lb_raw = get("lb", 0)
+    rarity_raw = get("rarity", 0)
+
+    # Format LB: 4 -> "MLB", others as-is
+    lb_display = LB_NAMES.get(lb_raw) or str(lb_raw)
+
+    # Format Rarity: 2 -> "SR", 3 -> "SSR"
+    rarity_display = RARITY_NAMES.get(rarity_raw) or str(rarity_raw)
+
+    type_cell = "" if type_name is None else f" {type_name} |"
+    return f"\n| {tier} | {score} | {name} |{type_cell} {lb_display} | {rarity_display} |"
+
+
+def write_markdown(out: TextIO, all_cards: List[EnrichedCard]) -> None:
+    """Write the Markdown visualization of score-sorted cards to a text stream.
+
+    `all_cards` must come from sort_cards_by_score. The output has no trailing
+    newline.
+    """
+    # The score-ordered list serves both sections: bucketing it by type leaves
+    # every group score-ordered too, with ties still in input order.
     cards_by_type: dict[int, List[EnrichedCard]] = {}
-    for card in cards:
+    for card in all_cards:
         card_type = card.get("type")
         if card_type is not None:
             if card_type not in cards_by_type:
                 cards_by_type[card_type] = []
             cards_by_type[card_type].append(card)
 
-    # Build markdown output
-    lines: List[str] = []
-    lines.append("# Uma Musume Card Collection")
+    # Each line after the title is written with its leading newline, so nothing
+    # trails the final row.
+    w = out.write
+    w("# Uma Musume Card Collection")
 
     for type_id in sorted(cards_by_type.keys()):
         type_name = TYPE_NAMES.get(type_id, f"Unknown Type {type_id}")
-        type_cards = cards_by_type[type_id]
-
-        # Sort by score descending
-        type_cards.sort(key=lambda c: c.get("score", 0), reverse=True)
-
-        lines.append(f"\n## {type_name}\n")
-        lines.append("| Tier | Score | Name | LB | Rarity |")
-        lines.append("|------|-------|------|----:|-------:|")
-
-        for card in type_cards:
-            tier = card.get("tier", "?")
-            score = card.get("score", 0)
-            name = card.get("name", "Unknown")
-            lb_raw = card.get("lb", 0)
-            rarity_raw = card.get("rarity", 0)
-
-            # Format LB: 4 -> "MLB", others as-is
-            lb_display = "MLB" if lb_raw == 4 else str(lb_raw)
-
-            # Format Rarity: 2 -> "SR", 3 -> "SSR"
-            rarity_display = (
-                "SSR"
-                if rarity_raw == 3
-                else ("SR" if rarity_raw == 2 else str(rarity_raw))
-            )
 
-            lines.append(
-                f"| {tier} | {score} | {name} | {lb_display} | {rarity_display} |"
-            )
+        w(f"\n\n## {type_name}\n")
+        w("\n| Tier | Score | Name | LB | Rarity |")
+        w("\n|------|-------|------|----:|-------:|")
+
+        for card in cards_by_type[type_id]:
+            w(_format_row(card))
 
     # Add an "All cards" section sorted by score (descending)
     # Include type in the table for this section
-    all_sorted = sorted(cards, key=lambda c: c.get("score", 0), reverse=True)
+    w("\n\n## All Cards (by Score)\n")
+    w("\n| Tier | Score | Name | Type | LB | Rarity |")
+    w("\n|------|-------|------|------|----:|-------:|")
 
-    lines.append("\n## All Cards (by Score)\n")
-    lines.append("| Tier | Score | Name | Type | LB | Rarity |")
-    lines.append("|------|-------|------|------|----:|-------:|")
+    # Labels per type id seen, so the fallback f-string is built once per type.
+    type_labels: dict[Any, str] = {}
 
-    for card in all_sorted:
-        tier = card.get("tier", "?")
-        score = card.get("score", 0)
-        name = card.get("name", "Unknown")
+    for card in all_cards:
         type_id = card.get("type", -1)
-        type_name = TYPE_NAMES.get(type_id, f"Type {type_id}")
-        lb_raw = card.get("lb", 0)
-        rarity_raw = card.get("rarity", 0)
+        type_name = type_labels.get(type_id)
+        if type_name is None:
+            type_name = TYPE_NAMES.get(type_id, f"Type {type_id}")
+            type_labels[type_id] = type_name
+        w(_format_row(card, type_name))
+
+
+def generate_markdown(cards: Iterable[EnrichedCard]) -> str:
+    """Generate Markdown visualization of cards grouped by type and sorted by score."""
+    buf = io.StringIO()
+    write_markdown(buf, sort_cards_by_score(cards))
+    return buf.getvalue()
+
+
+class _Mismatch(Exception):
+    """Raised by _MatchingWriter at the first difference from the existing file."""
+
+
+class _MatchingWriter(io.TextIOBase):
+    """A text sink that checks everything written to it against an existing file."""
+
+    def __init__(self, existing: TextIO) -> None:
+        self._existing = existing
+
+    def write(self, s: str) -> int:
+        # Compare against what a text-mode write would put on disk.
+        expected = s if os.linesep == "\n" else s.replace("\n", os.linesep)
+        if self._existing.read(len(expected)) != expected:
+            raise _Mismatch
+        return len(s)
+
+
+def _file_matches(path: Path, all_cards: List[EnrichedCard]) -> bool:
+    """Return whether `path` already holds exactly the Markdown for `all_cards`.
+
+    The Markdown is compared as it is generated, so it is never held in memory,
+    and the comparison stops at the first difference.
+    """
+    try:
+        # newline="" reads line endings untranslated, so a CRLF copy doesn't match.
+        with path.open("r", encoding="utf-8", newline="") as existing:
+            write_markdown(cast(TextIO, _MatchingWriter(existing)), all_cards)
+            return existing.read(1) == ""
+    except (_Mismatch, OSError, UnicodeDecodeError):
+        # Missing, unreadable, not UTF-8, or different: it needs writing.
+        return False
+
 
-        lb_display = "MLB" if lb_raw == 4 else str(lb_raw)
-        rarity_display = (
-            "SSR" if rarity_raw == 3 else ("SR" if rarity_raw == 2 else str(rarity_raw))
-        )
+def write_markdown_file(path: Path, all_cards: List[EnrichedCard]) -> bool:
+    """Write the Markdown for `all_cards` to `path` unless it already holds it.
 
-        lines.append(
-            f"| {tier} | {score} | {name} | {type_name} | {lb_display} | {rarity_display} |"
-        )
+    Returns whether the file was written. Leaving an unchanged file alone keeps
+    its mtime, so anything watching it doesn't see a spurious change. Both the
+    comparison and the write stream the Markdown rather than building it up as
+    one string, and the write replaces `path` atomically.
+    """
+    if _file_matches(path, all_cards):
+        return False
 
-    return "\n".join(lines)
+    with atomic_write(path, "w", encoding="utf-8") as f:
+        write_markdown(f, all_cards)
+    return True
 
 
 def add_subparser(subparsers: Any) -> None:
@@ -94,7 +174,7 @@ def add_subparser(subparsers: Any) -> None:
 
     parser = subparsers.add_parser(
         "visualize",
-        help="Generate Markdown visualization of enriched cards",
+        help=SUBCOMMANDS["visualize"][1],
         description="Generate Markdown visualization of enriched card data.",
     )
 
@@ -126,8 +206,9 @@ def add_subparser(subparsers: Any) -> None:
 def run(args: argparse.Namespace) -> int:
     """Execute the visualize subcommand."""
 
-    cards = load_enriched_cards(args.input)
-    markdown = generate_markdown(cards)
+    # Cards are loaded and sorted before the output file is opened, so a bad
+    # input never truncates an existing visualization.
+    all_cards = sort_cards_by_score(load_enriched_cards(args.input))
 
     # Write to file unless stdout-only
     if (
@@ -137,9 +218,10 @@ def run(args: argparse.Namespace) -> int:
     ):
         try:
             args.output.parent.mkdir(parents=True, exist_ok=True)
-            with args.output.open("w", encoding="utf-8") as f:
-                f.write(markdown)
-            print(f"Visualization written to {args.output}")
+            if write_markdown_file(args.output, all_cards):
+                print(f"Visualization written to {args.output}")
+            else:
+                print(f"Visualization in {args.output} is already up to date.")
         except OSError as e:
             print(
                 f"error: failed to write output file {args.output}: {e}",
@@ -149,6 +231,7 @@ def run(args: argparse.Namespace) -> int:
 
     # Print to stdout if requested
     if args.stdout:
-        print(markdown)
+        write_markdown(sys.stdout, all_cards)
+        sys.stdout.write("\n")
 
     return 0